@@ -15,8 +15,8 @@ def main() -> None:
     """
     n = 3
     y_vertices = [
-        YVertex(first=TwoInterval(0, 1), second=TwoInterval(None, None)),
-        YVertex(first=TwoInterval(1, 2), second=TwoInterval(None, None)),
+        YVertex(first=TwoInterval(0, 1), second=TwoInterval(-1, -1)),
+        YVertex(first=TwoInterval(1, 2), second=TwoInterval(-1, -1)),
         YVertex(first=TwoInterval(0, 0), second=TwoInterval(2, 2)),
     ]
     g = TwoIntervalBipartiteGraph(n=n, y_vertices=y_vertices)
@@ -8,6 +8,8 @@ from .dp_solver import (
     DPPredecessor,
     DPStats,
     HamiltonianDPSolver,
+    encode_state,
+    decode_state,
 )
 from .backtracking import HamiltonianBacktracking
 from .visualization import plot_interval_structure, plot_cycle
@@ -21,6 +23,8 @@ __all__ = [
     "DPPredecessor",
     "DPStats",
     "HamiltonianDPSolver",
+    "encode_state",
+    "decode_state",
     "HamiltonianBacktracking",
     "plot_interval_structure",
     "plot_cycle",
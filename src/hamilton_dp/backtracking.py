@@ -15,6 +15,15 @@ class HamiltonianBacktracking:
         self.g = graph
         self.n = graph.n
 
+        # Bitmask adjacency, built once (the graph is immutable):
+        # bit y of adj_x_mask[i] / bit i of adj_y_mask[y] is set iff x_i ~ y.
+        self.adj_x_mask: List[int] = [
+            sum(1 << y for y in ys) for ys in graph.neighbors_x
+        ]
+        self.adj_y_mask: List[int] = [
+            sum(1 << i for i in xs) for xs in graph.neighbors_y
+        ]
+
     def find_cycle(self) -> Optional[List[Tuple[str, int]]]:
         """
         Try to construct a Hamiltonian cycle as an alternating sequence
@@ -24,64 +33,62 @@ class HamiltonianBacktracking:
         if n == 0:
             return []
 
-        x_neighbors = self.g.neighbors_x
-        y_neighbors: List[List[int]] = [[] for _ in range(n)]
-        for i in range(n):
-            for y in x_neighbors[i]:
-                y_neighbors[y].append(i)
+        # Try starting from each X-vertex; _dfs_from starts each search
+        # with freshly initialised visited state.
+        for start in range(n):
+            path = self._dfs_from(start)
+            if path is not None:
+                return path
 
-        visited_x = [False] * n
-        visited_y = [False] * n
-        path: List[Tuple[str, int]] = []
+        return None
+
+    def _dfs_from(self, start: int) -> Optional[List[Tuple[str, int]]]:
+        """
+        Iterative DFS for an alternating Hamiltonian cycle through x_start.
+        Returns the vertex sequence starting at ('X', start) or None.
+        """
+        adj_x = self.adj_x_mask
+        adj_y = self.adj_y_mask
+        full = 2 * self.n
 
-        def is_edge(i: int, y: int) -> bool:
-            return y in x_neighbors[i]
+        visited_x = 1 << start
+        visited_y = 0
+        path: List[Tuple[str, int]] = [("X", start)]
+        # Each frame is (is_x, idx, unexplored neighbour mask).
+        stack: List[Tuple[bool, int, int]] = [(True, start, adj_x[start])]
 
-        def dfs(current_is_x: bool, current_idx: int) -> bool:
-            # Full alternating path reached
-            if len(path) == 2 * n:
-                first_type, first_idx = path[0]
-                if current_is_x == (first_type == "X"):
-                    return False
-                if current_is_x:
-                    return is_edge(current_idx, first_idx)
+        while stack:
+            is_x, idx, cand = stack[-1]
+            if not cand:
+                # All neighbours tried: backtrack
+                stack.pop()
+                path.pop()
+                if is_x:
+                    visited_x &= ~(1 << idx)
                 else:
-                    return is_edge(first_idx, current_idx)
+                    visited_y &= ~(1 << idx)
+                continue
 
-            if current_is_x:
+            low = cand & -cand
+            stack[-1] = (is_x, idx, cand ^ low)
+            nxt = low.bit_length() - 1
+
+            if is_x:
                 # X -> Y
-                for y in x_neighbors[current_idx]:
-                    if visited_y[y]:
-                        continue
-                    visited_y[y] = True
-                    path.append(("Y", y))
-                    if dfs(False, y):
-                        return True
+                visited_y |= low
+                path.append(("Y", nxt))
+                if len(path) == full:
+                    # Full alternating path reached: close back to x_start
+                    if (adj_x[start] >> nxt) & 1:
+                        return path
                     path.pop()
-                    visited_y[y] = False
+                    visited_y ^= low
+                    continue
+                stack.append((False, nxt, adj_y[nxt] & ~visited_x))
             else:
                 # Y -> X
-                for i in y_neighbors[current_idx]:
-                    if visited_x[i]:
-                        continue
-                    visited_x[i] = True
-                    path.append(("X", i))
-                    if dfs(True, i):
-                        return True
-                    path.pop()
-                    visited_x[i] = False
-
-            return False
-
-        # Try starting from each X-vertex
-        for start in range(n):
-            for i in range(n):
-                visited_x[i] = False
-                visited_y[i] = False
-            path.clear()
-            visited_x[start] = True
-            path.append(("X", start))
-            if dfs(True, start):
-                return path
+                visited_x |= low
+                path.append(("X", nxt))
+                stack.append((True, nxt, adj_x[nxt] & ~visited_y))
 
         return None
@@ -1,31 +1,61 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Tuple
-from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 from .intervals import TwoIntervalBipartiteGraph
 
 
-@dataclass(frozen=True)
+# Transition types and their indices in the per-type counter array.
+TTYPES: Tuple[str, ...] = ("INIT", "T1", "T2", "T3", "T4", "T5")
+_INIT, _T1, _T2, _T3, _T4, _T5 = range(len(TTYPES))
+
+# Edge ("X", i, "Y", y) added by a transition; payloads are immutable tuples
+# so the edge-free T5 payload can be one shared empty tuple.
+Edge = Tuple[str, int, str, int]
+_NO_EDGES: Tuple[Edge, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
 class DPState:
     """
     DP state: (k, O, L).
 
     k  – number of X-vertices already processed (0..n);
-    O  – sorted tuple of indices of 'open' Y-vertices (|O| <= 2);
+    O  – bitmask of 'open' Y-vertices, bit y set iff y ∈ O (|O| <= 2);
     L  – loose-flag in X (0/1): 1 means there is a loose end in X.
     """
     k: int
-    open_set: Tuple[int, ...]
+    open_mask: int
     loose_flag: int
 
 
-@dataclass
+def encode_state(k: int, open_mask: int, loose_flag: int, n: int) -> int:
+    """
+    Pack (k, O, L) into a single int key for a graph with |Y| = n:
+    bit 0 holds L, bits 1..n hold O and the remaining high bits hold k.
+    """
+    return (k << (n + 1)) | (open_mask << 1) | loose_flag
+
+
+def decode_state(key: int, n: int) -> DPState:
+    """Inverse of encode_state."""
+    return DPState(
+        k=key >> (n + 1),
+        open_mask=(key >> 1) & ((1 << n) - 1),
+        loose_flag=key & 1,
+    )
+
+
+@dataclass(slots=True)
 class DPPredecessor:
-    prev_state: DPState
+    """
+    Back-pointer of a DP state; prev_state is a packed key (see encode_state).
+    added_edges is only filled in when the solver runs with store_edges=True.
+    """
+    prev_state: int
     transition_type: str
-    added_edges: List[Tuple[str, int, str, int]]
+    added_edges: Tuple[Edge, ...]
 
 
 @dataclass
@@ -42,11 +72,8 @@ def check_stack_order(graph: TwoIntervalBipartiteGraph, y1: int, y2: int) -> boo
     Condition from Lemma 1(b): if y1 was opened earlier and y2 is opened now,
     we require I2_y1 > I1_y2 (in the sense that left(I2_y1) > right(I1_y2)).
     """
-    yv1 = graph.y_vertices[y1]
-    yv2 = graph.y_vertices[y2]
-    if yv1.second.is_empty or yv2.first.is_empty:
-        return False
-    return yv1.second.l > yv2.first.r
+    l2 = graph.L2[y1]
+    return l2 >= 0 and graph.L1[y2] >= 0 and l2 > graph.R1[y2]
 
 
 class HamiltonianDPSolver:
@@ -60,13 +87,31 @@ class HamiltonianDPSolver:
     would carry additional invariants.
     """
 
-    def __init__(self, graph: TwoIntervalBipartiteGraph) -> None:
+    def __init__(
+        self,
+        graph: TwoIntervalBipartiteGraph,
+        early_stop: bool = True,
+        store_edges: bool = False,
+    ) -> None:
         self.g = graph
         self.n = graph.n
-
-        self.reachable: Dict[DPState, bool] = {}
-        self.predecessor: Dict[DPState, DPPredecessor] = {}
-        self.transitions_per_type: Dict[str, int] = defaultdict(int)
+        # Stop as soon as the accepting state is reached (statistics then
+        # only cover the states explored so far).
+        self.early_stop = early_stop
+        # Keep added edges in every DPPredecessor; otherwise they are
+        # re-derived on demand by reconstruct_path().
+        self.store_edges = store_edges
+        self._events = graph.classify_events_at_all()
+
+        # All containers are keyed by packed state keys (see encode_state).
+        # A state is reachable iff it is a k = 1 seed or has a predecessor.
+        self._init_states: Set[int] = set()
+        self.predecessor: Dict[int, DPPredecessor] = {}
+        self._ttype_counts: List[int] = [0] * len(TTYPES)
+        self._states_per_k: List[int] = [0] * (self.n + 1)
+        # Reachable states bucketed by layer k, in order of discovery
+        # (at least layers 0 and 1, since the k = 1 seed exists even for n = 0).
+        self.layers: List[List[int]] = [[] for _ in range(max(self.n + 1, 2))]
 
     # --- Initialization at k = 1 -----------------------------------------
 
@@ -78,119 +123,128 @@ class HamiltonianDPSolver:
         - States where x0 is attached to some y ∈ N(x0).
         """
         g = self.g
+        n = self.n
 
-        base = DPState(k=1, open_set=tuple(), loose_flag=1)
-        self.reachable[base] = True
+        base = encode_state(1, 0, 1, n)
+        self._init_states.add(base)
+        self.layers[1].append(base)
 
         x0_neighbors = g.neighbors_of_x(0)
 
         for y in x0_neighbors:
-            yv = g.y_vertices[y]
-            O: Tuple[int, ...] = tuple()
+            O = 0
             # heuristic: y becomes 'open' only if it has a second interval
             # starting strictly to the right of x0
-            if (not yv.second.is_empty) and (yv.second.l > 0):
-                O = (y,)
-            s = DPState(k=1, open_set=O, loose_flag=1)
-            if s not in self.reachable:
-                self.reachable[s] = True
-                prev = DPState(k=0, open_set=tuple(), loose_flag=1)
+            if g.L2[y] > 0:
+                O = 1 << y
+            s = encode_state(1, O, 1, n)
+            if s not in self._init_states:
+                self._init_states.add(s)
+                self.layers[1].append(s)
+                prev = encode_state(0, 0, 1, n)
                 self.predecessor[s] = DPPredecessor(
                     prev_state=prev,
                     transition_type="INIT",
-                    added_edges=[("X", 0, "Y", y)],
+                    added_edges=(
+                        (("X", 0, "Y", y),) if self.store_edges else _NO_EDGES
+                    ),
                 )
-                self.transitions_per_type["INIT"] += 1
+                self._ttype_counts[_INIT] += 1
 
     # --- Transitions T1–T5 -----------------------------------------------
 
     def _enumerate_transitions(
         self,
-        state: DPState,
-    ) -> Iterable[Tuple[DPState, str, List[Tuple[str, int, str, int]]]]:
+        key: int,
+        with_edges: bool = True,
+    ) -> Iterator[Tuple[int, int, Tuple[Edge, ...]]]:
         """
-        Implement DP transitions (T1–T5) for vertex v = x_i, i = k.
-        Returns triples (new_state, transition_type, list_of_added_edges).
+        Implement DP transitions (T1–T5) for vertex v = x_i, i = k, where
+        key is the packed state (k, O, L) (see encode_state).
+        Yields triples (new_state_key, transition_type_index, added_edges),
+        where the index refers to TTYPES; added_edges is empty unless
+        with_edges is set.
         """
         g = self.g
         n = self.n
-        k = state.k
-        O = list(state.open_set)
-        L = state.loose_flag
+        k = key >> (n + 1)
+        O = (key >> 1) & ((1 << n) - 1)
+        L = key & 1
 
         if k >= n:
-            return []
+            return
 
         i = k
-        v_neighbors = g.neighbors_of_x(i)
-        if not v_neighbors:
-            return []
+        if not g.neighbors_x[i]:
+            return
 
-        E1, E2, E3, E4 = g.classify_events_at(i)
-        Oset = set(O)
-        results: List[Tuple[DPState, str, List[Tuple[str, int, str, int]]]] = []
+        E1, E2, E3, E4 = self._events[i]
+        n_open = O.bit_count()
+        # Packed key of (k + 1, ∅, 0); new keys OR in (O << 1) | L.
+        next_key = (k + 1) << (n + 1)
 
         # --- T1: L=1, connect to closing yclose (type E3) -----------------
         if L == 1:
-            for yclose in (Oset & E3):
-                new_O = tuple(sorted(y for y in O if y != yclose))
-                new_state = DPState(k=k + 1, open_set=new_O, loose_flag=0)
-                edges = [("X", i, "Y", yclose)]
-                results.append((new_state, "T1", edges))
+            m = O & E3
+            while m:
+                yclose = (m & -m).bit_length() - 1
+                m &= m - 1
+                new_O = O & ~(1 << yclose)
+                new_state = next_key | (new_O << 1)
+                edges = (("X", i, "Y", yclose),) if with_edges else _NO_EDGES
+                yield new_state, _T1, edges
 
         # --- T2: L=1, connect to new open yopen (E1 or E2) ---------------
-        if L == 1:
-            candidates_yopen = (E1 | E2) - Oset
-            for yopen in candidates_yopen:
-                if len(O) >= 2:
+        if L == 1 and n_open < 2:
+            m = (E1 | E2) & ~O
+            y_old = O.bit_length() - 1  # only meaningful when n_open == 1
+            while m:
+                yopen = (m & -m).bit_length() - 1
+                m &= m - 1
+                if n_open == 1 and not check_stack_order(g, y_old, yopen):
                     continue
-                if len(O) == 1:
-                    y_old = O[0]
-                    if not check_stack_order(g, y_old, yopen):
-                        continue
-                    O_after = {y_old, yopen}
-                else:
-                    O_after = {yopen}
-                new_O = tuple(sorted(O_after))
-                new_state = DPState(k=k + 1, open_set=new_O, loose_flag=0)
-                edges = [("X", i, "Y", yopen)]
-                results.append((new_state, "T2", edges))
+                new_O = O | (1 << yopen)
+                new_state = next_key | (new_O << 1)
+                edges = (("X", i, "Y", yopen),) if with_edges else _NO_EDGES
+                yield new_state, _T2, edges
 
         # --- T3: L=0, connect between yclose ∈ O∩E3 and yopen ∈ E2\O -----
-        if L == 0:
-            for yclose in (Oset & E3):
-                for yopen in (E2 - Oset):
-                    O_before = [y for y in O if y != yclose]
-                    if len(O_before) > 1:
-                        continue
-                    if len(O_before) == 1:
-                        y_old = O_before[0]
+        open_candidates = E2 & ~O
+        if L == 0 and n_open <= 2 and open_candidates:
+            m_close = O & E3
+            while m_close:
+                yclose = (m_close & -m_close).bit_length() - 1
+                m_close &= m_close - 1
+                O_before = O & ~(1 << yclose)
+                m_open = open_candidates
+                while m_open:
+                    yopen = (m_open & -m_open).bit_length() - 1
+                    m_open &= m_open - 1
+                    if O_before:
+                        y_old = O_before.bit_length() - 1
                         if not check_stack_order(g, y_old, yopen):
                             continue
-                        O_after = {y_old, yopen}
-                    else:
-                        O_after = {yopen}
-                    new_O = tuple(sorted(O_after))
-                    new_state = DPState(k=k + 1, open_set=new_O, loose_flag=0)
-                    edges = [("X", i, "Y", yclose), ("X", i, "Y", yopen)]
-                    results.append((new_state, "T3", edges))
+                    new_O = O_before | (1 << yopen)
+                    new_state = next_key | (new_O << 1)
+                    edges = (
+                        (("X", i, "Y", yclose), ("X", i, "Y", yopen))
+                        if with_edges
+                        else _NO_EDGES
+                    )
+                    yield new_state, _T3, edges
 
         # --- T4: L=1, convex y at position i ------------------------------
-        if L == 1:
-            for y in v_neighbors:
-                if not g.is_convex_at(y, i):
-                    continue
-                new_state = DPState(k=k + 1, open_set=tuple(sorted(O)), loose_flag=1)
-                edges = [("X", i, "Y", y)]
-                results.append((new_state, "T4", edges))
+        convex = g.convex_neighbors_of_x(i)
+        if L == 1 and convex:
+            for y in convex:
+                new_state = next_key | (O << 1) | 1
+                edges = (("X", i, "Y", y),) if with_edges else _NO_EDGES
+                yield new_state, _T4, edges
 
         # --- T5: no interval boundaries in position i ---------------------
         if not (E1 or E2 or E3 or E4):
-            new_state = DPState(k=k + 1, open_set=tuple(sorted(O)), loose_flag=L)
-            edges: List[Tuple[str, int, str, int]] = []
-            results.append((new_state, "T5", edges))
-
-        return results
+            new_state = next_key | (O << 1) | L
+            yield new_state, _T5, _NO_EDGES
 
     # --- Main DP run ------------------------------------------------------
 
@@ -200,45 +254,104 @@ class HamiltonianDPSolver:
 
         Returns DPStats with acceptance flag and statistics about the DP layers.
         """
-        self.reachable.clear()
+        self._init_states.clear()
         self.predecessor.clear()
-        self.transitions_per_type.clear()
+        self._ttype_counts = [0] * len(TTYPES)
+        self._states_per_k = [0] * (self.n + 1)
+        self.layers = [[] for _ in range(max(self.n + 1, 2))]
 
         self._initial_states()
 
-        states_per_k: Dict[int, int] = defaultdict(int)
-
-        for k in range(1, self.n):
-            current_states = [s for s in self.reachable.keys() if s.k == k]
+        states_per_k = self._states_per_k
+        pred = self.predecessor
+        ttc = self._ttype_counts
+        layers = self.layers
+        n = self.n
+        early_stop = self.early_stop
+        store_edges = self.store_edges
+        enumerate_transitions = self._enumerate_transitions
+        final_state = encode_state(n, 0, 0, n)
+        found = False
+        last_k = 0
+
+        for k in range(1, n):
+            last_k = k
+            current_states = layers[k]
             states_per_k[k] = len(current_states)
-
-            for state in current_states:
-                if not self.reachable.get(state, False):
-                    continue
-                for new_state, ttype, edges in self._enumerate_transitions(state):
-                    if new_state not in self.reachable:
-                        self.reachable[new_state] = True
-                        self.predecessor[new_state] = DPPredecessor(
-                            prev_state=state,
-                            transition_type=ttype,
+            next_append = layers[k + 1].append
+
+            for key in current_states:
+                for new_state, ttype, edges in enumerate_transitions(key, store_edges):
+                    # Transitions only produce k >= 2, so seeds never collide here.
+                    if new_state not in pred:
+                        pred[new_state] = DPPredecessor(
+                            prev_state=key,
+                            transition_type=TTYPES[ttype],
                             added_edges=edges,
                         )
-                        self.transitions_per_type[ttype] += 1
+                        next_append(new_state)
+                        ttc[ttype] += 1
+                        if early_stop and new_state == final_state:
+                            found = True
+                            break
+                if found:
+                    break
+            if found:
+                break
 
-        final_state = DPState(k=self.n, open_set=tuple(), loose_flag=0)
-        accepted = self.reachable.get(final_state, False)
+        accepted = final_state in pred or final_state in self._init_states
 
-        total_states = len(self.reachable)
-        max_states_per_k = max(states_per_k.values()) if states_per_k else 0
+        total_states = sum(len(layer) for layer in layers)
+        max_states_per_k = max(states_per_k, default=0)
 
         return DPStats(
             total_states=total_states,
-            states_per_k=dict(states_per_k),
+            states_per_k={k: states_per_k[k] for k in range(1, last_k + 1)},
             max_states_per_k=max_states_per_k,
-            transitions_per_type=dict(self.transitions_per_type),
+            transitions_per_type={
+                name: count for name, count in zip(TTYPES, ttc) if count
+            },
             accepted=accepted,
         )
 
+    def reconstruct_path(self, key: Optional[int] = None) -> List[Edge]:
+        """
+        Return the edges added along the DP path leading to the packed state
+        key (by default the accepting state (n, ∅, 0)), in order of k.
+
+        Edges are read from the predecessor records if the solver ran with
+        store_edges=True, and re-derived from the transition rules otherwise.
+        Must be called after run(); raises KeyError for unreached states.
+        """
+        n = self.n
+        pred = self.predecessor
+        if key is None:
+            key = encode_state(n, 0, 0, n)
+        if key not in pred and key not in self._init_states:
+            raise KeyError(f"DP state {decode_state(key, n)} was not reached.")
+
+        chunks: List[Tuple[Edge, ...]] = []
+        while key in pred:
+            p = pred[key]
+            if self.store_edges:
+                edges = p.added_edges
+            elif p.transition_type == "INIT":
+                # Seeds with a predecessor have O = {y} for the attached y.
+                y = ((key >> 1) & ((1 << n) - 1)).bit_length() - 1
+                edges = (("X", 0, "Y", y),)
+            else:
+                # The recorded transition is the first one from prev_state
+                # that produces key.
+                edges = next(
+                    e
+                    for new_state, _, e in self._enumerate_transitions(p.prev_state)
+                    if new_state == key
+                )
+            chunks.append(edges)
+            key = p.prev_state
+
+        return [e for edges in reversed(chunks) for e in edges]
+
     def has_hamiltonian_cycle(self) -> bool:
         """Convenience wrapper: run DP and return acceptance flag."""
         stats = self.run()
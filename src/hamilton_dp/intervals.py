@@ -1,41 +1,38 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
-from typing import List, Optional, Tuple, Set
+from typing import FrozenSet, List, Tuple
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TwoInterval:
     """
-    Closed interval [l, r] on the X side, or empty if l or r is None.
+    Closed interval [l, r] on the X side, or empty if l = r = -1.
 
     Indices are 0-based and inclusive: 0 <= l <= r < n.
     """
-    l: Optional[int]
-    r: Optional[int]
+    l: int
+    r: int
 
     @property
     def is_empty(self) -> bool:
-        return self.l is None or self.r is None
+        return self.l < 0
 
     def contains(self, i: int) -> bool:
-        if self.is_empty:
-            return False
-        return self.l <= i <= self.r
+        return self.l >= 0 and self.l <= i <= self.r
 
     def is_left_endpoint(self, i: int) -> bool:
-        return (not self.is_empty) and self.l == i
+        return self.l >= 0 and self.l == i
 
     def is_right_endpoint(self, i: int) -> bool:
-        return (not self.is_empty) and self.r == i
+        return self.l >= 0 and self.r == i
 
     def strictly_inside(self, i: int) -> bool:
-        if self.is_empty:
-            return False
-        return self.l < i < self.r
+        return self.l >= 0 and self.l < i < self.r
 
 
-@dataclass
+@dataclass(slots=True)
 class YVertex:
     """
     Vertex from the Y-part of the bipartite graph.
@@ -57,6 +54,10 @@ class TwoIntervalBipartiteGraph:
     - X = {0, 1, ..., n-1}
     - for each y, I1_y and I2_y are non-overlapping intervals with a gap:
       if both non-empty, then r(I1_y) < l(I2_y).
+
+    y_vertices is the canonical (object-per-interval) description; hot paths
+    read the struct-of-arrays view L1, R1, L2, R2 built from it, where
+    L1[y], R1[y] are the endpoints of I1_y (and L2, R2 of I2_y), -1 if empty.
     """
     n: int
     y_vertices: List[YVertex]
@@ -66,53 +67,107 @@ class TwoIntervalBipartiteGraph:
 
         for yv in self.y_vertices:
             for it in (yv.first, yv.second):
-                if not it.is_empty:
+                if it.is_empty:
+                    assert it.l == it.r == -1, "Empty intervals are encoded as (-1, -1)."
+                else:
                     assert 0 <= it.l <= it.r < self.n
-            if (not yv.first.is_empty) and (not yv.second.is_empty):
+            if yv.first.l >= 0 and yv.second.l >= 0:
                 assert yv.first.r < yv.second.l, "Intervals I1 and I2 must be disjoint and ordered."
 
-        # Build adjacency lists X -> Y and edge set for convenience / reporting.
-        self.neighbors_x: List[List[int]] = [[] for _ in range(self.n)]
-        self.edges: Set[Tuple[str, int, str, int]] = set()
-
-        for y_idx, yv in enumerate(self.y_vertices):
-            for it in (yv.first, yv.second):
-                if it.is_empty:
+        # Struct-of-arrays view of the interval endpoints.
+        self.L1: array[int] = array("i", (yv.first.l for yv in self.y_vertices))
+        self.R1: array[int] = array("i", (yv.first.r for yv in self.y_vertices))
+        self.L2: array[int] = array("i", (yv.second.l for yv in self.y_vertices))
+        self.R2: array[int] = array("i", (yv.second.r for yv in self.y_vertices))
+        L1, R1, L2, R2 = self.L1, self.R1, self.L2, self.R2
+
+        # Build adjacency lists X -> Y, Y -> X and edge count for reporting.
+        neighbors_x: List[List[int]] = [[] for _ in range(self.n)]
+        neighbors_y: List[List[int]] = [[] for _ in range(self.n)]
+        self.num_edges: int = 0
+
+        for y_idx in range(self.n):
+            for l, r in ((L1[y_idx], R1[y_idx]), (L2[y_idx], R2[y_idx])):
+                if l < 0:
                     continue
-                for i in range(it.l, it.r + 1):
-                    self.neighbors_x[i].append(y_idx)
-                    self.edges.add(("X", i, "Y", y_idx))
+                for i in range(l, r + 1):
+                    neighbors_x[i].append(y_idx)
+                    neighbors_y[y_idx].append(i)
+                self.num_edges += r - l + 1
+
+        # Freeze adjacency: sorted tuples for iteration, frozensets for membership.
+        self.neighbors_x: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(sorted(lst)) for lst in neighbors_x
+        )
+        self.neighbors_x_set: Tuple[FrozenSet[int], ...] = tuple(
+            frozenset(lst) for lst in self.neighbors_x
+        )
+        self.neighbors_y: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(lst) for lst in neighbors_y
+        )
+
+        # Event bitmasks E1–E4 per position i: bit y is set iff y is in the set.
+        self.E1_mask: List[int] = [0] * self.n
+        self.E2_mask: List[int] = [0] * self.n
+        self.E3_mask: List[int] = [0] * self.n
+        self.E4_mask: List[int] = [0] * self.n
+
+        for y_idx in range(self.n):
+            bit = 1 << y_idx
+            if L1[y_idx] >= 0:
+                self.E1_mask[L1[y_idx]] |= bit
+                self.E2_mask[R1[y_idx]] |= bit
+            if L2[y_idx] >= 0:
+                self.E3_mask[L2[y_idx]] |= bit
+                self.E4_mask[R2[y_idx]] |= bit
+
+        self._E: Tuple[Tuple[int, int, int, int], ...] = tuple(
+            zip(self.E1_mask, self.E2_mask, self.E3_mask, self.E4_mask)
+        )
+
+        # Rightmost neighbour of each y (-1 if y is isolated) and, per position i,
+        # the neighbours of x_i that are convex at i (used by the DP T4 rule).
+        self._y_max_r: List[int] = [max(r1, r2) for r1, r2 in zip(R1, R2)]
+        self._convex_neighbors_at: List[List[int]] = [
+            [y for y in self.neighbors_x[i] if 0 <= self._y_max_r[y] <= i]
+            for i in range(self.n)
+        ]
 
     # --- Events E1–E4 -----------------------------------------------------
 
-    def classify_events_at(self, i: int) -> Tuple[Set[int], Set[int], Set[int], Set[int]]:
+    def classify_events_at(self, i: int) -> Tuple[int, int, int, int]:
         """
-        For vertex x_i return four sets:
+        For vertex x_i return four bitmasks over Y (bit y set iff y belongs):
 
         E1: all y such that i is the left endpoint of I1_y;
         E2: all y such that i is the right endpoint of I1_y;
         E3: all y such that i is the left endpoint of I2_y;
         E4: all y such that i is the right endpoint of I2_y.
         """
-        E1, E2, E3, E4 = set(), set(), set(), set()
+        if not 0 <= i < self.n:
+            return 0, 0, 0, 0
+        return self._E[i]
 
-        for y, yv in enumerate(self.y_vertices):
-            if yv.first.is_left_endpoint(i):
-                E1.add(y)
-            if yv.first.is_right_endpoint(i):
-                E2.add(y)
-            if yv.second.is_left_endpoint(i):
-                E3.add(y)
-            if yv.second.is_right_endpoint(i):
-                E4.add(y)
-
-        return E1, E2, E3, E4
+    def classify_events_at_all(self) -> Tuple[Tuple[int, int, int, int], ...]:
+        """
+        Event bitmasks (E1, E2, E3, E4) for every position i = 0..n-1,
+        computed once in a single pass over Y at construction time.
+        """
+        return self._E
 
     # --- Neighbourhood helpers -------------------------------------------
 
-    def neighbors_of_x(self, i: int) -> List[int]:
-        """Return indices of Y-neighbours of x_i."""
-        return self.neighbors_x[i] if 0 <= i < self.n else []
+    def neighbors_of_x(self, i: int) -> Tuple[int, ...]:
+        """Return indices of Y-neighbours of x_i (sorted)."""
+        return self.neighbors_x[i] if 0 <= i < self.n else ()
+
+    def has_edge(self, i: int, y: int) -> bool:
+        """Return True iff (x_i, y) is an edge."""
+        return 0 <= i < self.n and y in self.neighbors_x_set[i]
+
+    def neighbors_of_y(self, y: int) -> Tuple[int, ...]:
+        """Return indices of X-neighbours of y (sorted)."""
+        return self.neighbors_y[y] if 0 <= y < self.n else ()
 
     def is_convex_at(self, y: int, i: int) -> bool:
         """
@@ -122,12 +177,9 @@ class TwoIntervalBipartiteGraph:
         In the 2-interval representation this is equivalent to:
             max(r1, r2) <= i   (for all non-empty intervals).
         """
-        yv = self.y_vertices[y]
-        rs = []
-        if not yv.first.is_empty:
-            rs.append(yv.first.r)
-        if not yv.second.is_empty:
-            rs.append(yv.second.r)
-        if not rs:
-            return False
-        return max(rs) <= i
+        max_r = self._y_max_r[y]
+        return max_r != -1 and max_r <= i
+
+    def convex_neighbors_of_x(self, i: int) -> List[int]:
+        """Return indices of Y-neighbours of x_i that are convex at position i."""
+        return self._convex_neighbors_at[i] if 0 <= i < self.n else []
@@ -22,7 +22,7 @@ def generate_markdown_report(
     the (optional) Hamiltonian cycle found by backtracking.
     """
     n = graph.n
-    m = len(graph.edges)
+    m = graph.num_edges
 
     lines: List[str] = []
 
@@ -110,7 +110,8 @@ def run_full_report(
         {prefix}_intervals.png
         (optionally) {prefix}_cycle.png
     """
-    dp_solver = HamiltonianDPSolver(graph)
+    # The report prints full layer statistics, so explore every layer.
+    dp_solver = HamiltonianDPSolver(graph, early_stop=False)
     dp_stats = dp_solver.run()
 
     intervals_png = f"{prefix}_intervals.png"
@@ -12,8 +12,8 @@ def build_hamiltonian_n3_graph() -> TwoIntervalBipartiteGraph:
     """
     n = 3
     y_vertices = [
-        YVertex(first=TwoInterval(0, 1), second=TwoInterval(None, None)),
-        YVertex(first=TwoInterval(1, 2), second=TwoInterval(None, None)),
+        YVertex(first=TwoInterval(0, 1), second=TwoInterval(-1, -1)),
+        YVertex(first=TwoInterval(1, 2), second=TwoInterval(-1, -1)),
         YVertex(first=TwoInterval(0, 0), second=TwoInterval(2, 2)),
     ]
     return TwoIntervalBipartiteGraph(n=n, y_vertices=y_vertices)
@@ -27,10 +27,10 @@ def build_non_hamiltonian_n3_graph() -> TwoIntervalBipartiteGraph:
     """
     n = 3
     y_vertices = [
-        YVertex(first=TwoInterval(0, 1), second=TwoInterval(None, None)),
-        YVertex(first=TwoInterval(1, 2), second=TwoInterval(None, None)),
+        YVertex(first=TwoInterval(0, 1), second=TwoInterval(-1, -1)),
+        YVertex(first=TwoInterval(1, 2), second=TwoInterval(-1, -1)),
         # y2 only adjacent to X0, not to X2
-        YVertex(first=TwoInterval(0, 0), second=TwoInterval(None, None)),
+        YVertex(first=TwoInterval(0, 0), second=TwoInterval(-1, -1)),
     ]
     return TwoIntervalBipartiteGraph(n=n, y_vertices=y_vertices)
 
@@ -48,6 +48,36 @@ def test_hamiltonian_graph_dp_and_backtracking_agree():
     assert len(cycle) == 2 * g.n
 
 
+def test_early_stop_does_not_change_acceptance():
+    g = build_hamiltonian_n3_graph()
+
+    early = HamiltonianDPSolver(g).run()
+    full = HamiltonianDPSolver(g, early_stop=False).run()
+    assert early.accepted and full.accepted
+    assert early.total_states == 10
+    assert full.total_states == 11
+
+
+def test_reconstructed_path_matches_stored_edges():
+    g = build_hamiltonian_n3_graph()
+
+    lazy = HamiltonianDPSolver(g)
+    stored = HamiltonianDPSolver(g, store_edges=True)
+    assert lazy.run().accepted and stored.run().accepted
+    assert all(p.added_edges == () for p in lazy.predecessor.values())
+    assert lazy.reconstruct_path() == stored.reconstruct_path()
+    assert lazy.reconstruct_path()[0] == ("X", 0, "Y", 2)
+
+
+def test_empty_graph_dp():
+    g = TwoIntervalBipartiteGraph(n=0, y_vertices=[])
+
+    stats = HamiltonianDPSolver(g).run()
+    assert stats.total_states == 1
+    assert stats.states_per_k == {}
+    assert not stats.accepted
+
+
 def test_non_hamiltonian_graph_dp():
     g = build_non_hamiltonian_n3_graph()
 
@@ -64,3 +94,10 @@ def test_backtracking_detects_absence_of_cycle():
     back = HamiltonianBacktracking(g)
     cycle = back.find_cycle()
     assert cycle is None, "Backtracking should not find a Hamiltonian cycle in a non-Hamiltonian graph."
+
+
+def test_edge_count_and_membership():
+    g = build_hamiltonian_n3_graph()
+    assert g.num_edges == 6
+    assert g.has_edge(0, 2) and g.has_edge(2, 2)
+    assert not g.has_edge(1, 2)